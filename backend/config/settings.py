@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     aws_access_key: str = ""
     aws_secret_key: str = ""
     aws_region: str = "us-east-1"
+    aws_transcribe_bucket: str = ""
+    aws_streaming_transcription: bool = False
     tavily_api_key: str = ""
     
     # Database Configuration
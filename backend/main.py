@@ -37,9 +37,15 @@ async def lifespan(app: FastAPI):
     
     # Initialize all services
     services['rime'] = RimeVoiceService(settings.rime_api_key)
-    services['stt'] = SpeechToTextService(settings.aws_access_key, settings.aws_secret_key, settings.aws_region)
+    services['stt'] = SpeechToTextService(
+        settings.aws_access_key,
+        settings.aws_secret_key,
+        settings.aws_region,
+        settings.aws_transcribe_bucket,
+        settings.aws_streaming_transcription
+    )
     services['aws'] = AWSBedrockService(settings.aws_access_key, settings.aws_secret_key, settings.aws_region)
-    services['mongodb'] = MongoVectorService(settings.mongodb_uri, settings.mongodb_database)
+    services['mongodb'] = MongoVectorService(settings.mongodb_uri, settings.mongodb_database, settings.vector_dimension)
     services['tavily'] = TavilySearchService(settings.tavily_api_key)
     services['clickhouse'] = ClickHouseService(settings.clickhouse_host, settings.clickhouse_user, settings.clickhouse_password)
     services['websocket'] = WebSocketManager()
@@ -68,6 +74,8 @@ async def lifespan(app: FastAPI):
         await services['stt'].close()
     if services.get('rime'):
         await services['rime'].close()
+    if services.get('tavily'):
+        await services['tavily'].close()
 
 app = FastAPI(
     title="Babelfish Enterprise AI Backend",
@@ -113,10 +121,13 @@ async def translate_technical_term(request: ConversationRequest):
         
         # Step 1: Search existing knowledge base using vector similarity
         logger.info(f"Processing translation request: {request.input_text}")
+        # One embedding serves both the $vectorSearch query and the stored translation
+        query_embedding = await services['aws'].generate_embedding(request.input_text)
         vector_results = await services['mongodb'].search_similar_terms(
             request.input_text, 
             limit=3,
-            threshold=0.7
+            threshold=0.7,
+            query_embedding=query_embedding
         )
         
         # Step 2: If no good match, search web for current definitions
@@ -133,7 +144,8 @@ async def translate_technical_term(request: ConversationRequest):
             term=request.input_text,
             existing_definitions=vector_results,
             web_context=web_results,
-            business_context=request.business_context
+            business_context=request.business_context,
+            embedding=query_embedding
         )
         
         # Step 4: Create comprehensive response
@@ -199,6 +211,7 @@ async def synthesize_speech(request: Dict[str, Any]):
         text = request.get('text')
         voice_style = request.get('voice_style', 'professional_female')
         speed = request.get('speed', 1.0)
+        output_format = request.get('output_format', 'mp3')
         
         if not text:
             raise HTTPException(status_code=400, detail="Text is required")
@@ -208,7 +221,7 @@ async def synthesize_speech(request: Dict[str, Any]):
             text=text,
             voice_style=voice_style,
             speed=speed,
-            output_format='mp3'
+            output_format=output_format
         )
         
         # Collect all audio data into a single response
@@ -220,12 +233,8 @@ async def synthesize_speech(request: Dict[str, Any]):
             raise HTTPException(status_code=500, detail="No audio data generated")
         
         # Determine media type based on audio data
-        if audio_data.startswith(b'RIFF'):
-            media_type = "audio/wav"
-            filename = "speech.wav"
-        else:
-            media_type = "audio/mpeg"
-            filename = "speech.mp3"
+        media_type, extension = services['rime'].describe_audio(audio_data, output_format)
+        filename = f"speech.{extension}"
         
         return Response(
             content=audio_data,
@@ -369,12 +378,8 @@ async def test_voice_synthesis():
             raise HTTPException(status_code=500, detail="No audio data generated")
         
         # Determine media type based on audio data
-        if audio_data.startswith(b'RIFF'):
-            media_type = "audio/wav"
-            filename = "test.wav"
-        else:
-            media_type = "audio/mpeg"
-            filename = "test.mp3"
+        media_type, extension = services['rime'].describe_audio(audio_data, 'mp3')
+        filename = f"test.{extension}"
         
         return Response(
             content=audio_data,
@@ -528,6 +533,11 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 asyncio.create_task(
                     process_audio_chunk(websocket, session_id, message['data'])
                 )
+            elif message['type'] == 'subscribe_status':
+                # Opt in to other sessions' status changes (dashboards, admin views)
+                services['websocket'].subscribe_to_status_events(session_id)
+            elif message['type'] == 'unsubscribe_status':
+                services['websocket'].unsubscribe_from_status_events(session_id)
             
     except WebSocketDisconnect:
         await services['websocket'].disconnect(websocket, session_id)
@@ -535,15 +545,20 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         logger.error(f"WebSocket error: {str(e)}")
         await services['websocket'].disconnect(websocket, session_id)
 
+async def send_session_message(session_id: str, message: Dict[str, Any]):
+    """Queue a reply for a session, raising once the session is gone so the caller stops its work"""
+    if not await services['websocket'].send_personal_message(session_id, message):
+        raise WebSocketDisconnect()
+
 async def process_realtime_translation(websocket: WebSocket, session_id: str, data: Dict):
     """Process translation and send real-time updates"""
     try:
         # Send processing status
-        await websocket.send_text(json.dumps({
+        await send_session_message(session_id, {
             'type': 'status',
             'status': 'processing',
             'message': 'Analyzing technical terminology...'
-        }))
+        })
         
         # Create translation request
         request = ConversationRequest(
@@ -556,26 +571,26 @@ async def process_realtime_translation(websocket: WebSocket, session_id: str, da
         response = await translate_technical_term(request)
         
         # Send completed translation
-        await websocket.send_text(json.dumps({
+        await send_session_message(session_id, {
             'type': 'translation_complete',
             'data': response.dict()
-        }))
+        })
         
     except Exception as e:
-        await websocket.send_text(json.dumps({
+        await services['websocket'].send_personal_message(session_id, {
             'type': 'error',
             'message': f'Translation failed: {str(e)}'
-        }))
+        })
 
 async def process_voice_input(websocket: WebSocket, session_id: str, data: Dict):
     """Process voice input and return synthesized response"""
     try:
         # Send processing status
-        await websocket.send_text(json.dumps({
+        await send_session_message(session_id, {
             'type': 'status',
             'status': 'processing_voice',
             'message': 'Processing voice input...'
-        }))
+        })
         
         # Transcribe audio if provided
         if data.get('audio_data'):
@@ -591,53 +606,53 @@ async def process_voice_input(websocket: WebSocket, session_id: str, data: Dict)
             )
             
             if transcription.get('error'):
-                await websocket.send_text(json.dumps({
+                await send_session_message(session_id, {
                     'type': 'error',
                     'message': f'Transcription failed: {transcription["error"]}'
-                }))
+                })
                 return
             
             # Use transcribed text for translation
             data['text'] = transcription['text']
             
             # Send transcription result
-            await websocket.send_text(json.dumps({
+            await send_session_message(session_id, {
                 'type': 'transcription_complete',
                 'text': transcription['text'],
                 'confidence': transcription['confidence']
-            }))
+            })
         
         # Process the translation
         await process_realtime_translation(websocket, session_id, data)
         
         # Generate voice response if requested
         if data.get('synthesize_response'):
-            await websocket.send_text(json.dumps({
+            await send_session_message(session_id, {
                 'type': 'status',
                 'status': 'synthesizing',
                 'message': 'Generating voice response...'
-            }))
+            })
             
             # Generate speech for the response
             # This would be implemented with the actual response text
             
     except Exception as e:
-        await websocket.send_text(json.dumps({
+        await services['websocket'].send_personal_message(session_id, {
             'type': 'error',
             'message': f'Voice processing failed: {str(e)}'
-        }))
+        })
 
 async def process_streaming_transcription(websocket: WebSocket, session_id: str, data: Dict):
     """Start real-time streaming transcription"""
     try:
         language_code = data.get('language_code', 'en-US')
         
-        await websocket.send_text(json.dumps({
+        await send_session_message(session_id, {
             'type': 'transcription_started',
             'session_id': session_id,
             'language_code': language_code,
             'message': 'Real-time transcription started'
-        }))
+        })
         
         # Store transcription session info
         services['websocket'].transcription_sessions[session_id] = {
@@ -648,10 +663,10 @@ async def process_streaming_transcription(websocket: WebSocket, session_id: str,
         }
         
     except Exception as e:
-        await websocket.send_text(json.dumps({
+        await services['websocket'].send_personal_message(session_id, {
             'type': 'error',
             'message': f'Failed to start transcription: {str(e)}'
-        }))
+        })
 
 async def process_audio_chunk(websocket: WebSocket, session_id: str, data: Dict):
     """Process audio chunk for real-time transcription"""
@@ -679,22 +694,23 @@ async def process_audio_chunk(websocket: WebSocket, session_id: str, data: Dict)
             )
             
             if result.get('text'):
-                await websocket.send_text(json.dumps({
+                await send_session_message(session_id, {
                     'type': 'partial_transcription',
                     'text': result['text'],
                     'confidence': result['confidence'],
                     'is_final': False
-                }))
+                })
             
             # Clear buffer
             session_info['buffer'] = b""
         
     except Exception as e:
-        await websocket.send_text(json.dumps({
+        await services['websocket'].send_personal_message(session_id, {
             'type': 'error',
             'message': f'Audio chunk processing failed: {str(e)}'
-        }))
+        })
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Broadcast payloads are small JSON frames; per-connection deflate would recompress each one per recipient
+    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True, ws_per_message_deflate=False)
\ No newline at end of file
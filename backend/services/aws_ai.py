@@ -48,7 +48,8 @@ class AWSBedrockService:
         term: str,
         existing_definitions: Optional[List[Dict]] = None,
         web_context: Optional[List[Dict]] = None,
-        business_context: Optional[str] = None
+        business_context: Optional[str] = None,
+        embedding: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """
         Analyze a technical term using AWS Bedrock
@@ -58,6 +59,7 @@ class AWSBedrockService:
             existing_definitions: Existing definitions from vector search
             web_context: Web search results for additional context
             business_context: Additional business context
+            embedding: Embedding of term already generated by the caller
             
         Returns:
             Comprehensive analysis including explanation, category, confidence, etc.
@@ -73,8 +75,9 @@ class AWSBedrockService:
             # Generate analysis using Claude
             analysis_response = await self._invoke_claude(prompt)
             
-            # Generate embedding for the term
-            embedding = await self._generate_embedding(term)
+            # Generate embedding for the term unless the caller already has one
+            if embedding is None:
+                embedding = await self._generate_embedding(term)
             
             # Parse and structure the response
             structured_analysis = self._parse_analysis_response(analysis_response)
@@ -90,7 +93,7 @@ class AWSBedrockService:
             
         except Exception as e:
             logger.error(f"Technical term analysis failed: {str(e)}")
-            return self._fallback_analysis(term, (time.time() - start_time) * 1000)
+            return self._fallback_analysis(term, (time.time() - start_time) * 1000, embedding)
     
     def _build_analysis_prompt(
         self,
@@ -191,6 +194,10 @@ Return ONLY the JSON object, no additional text."""
             logger.error(f"Claude invocation error: {str(e)}")
             raise
     
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate an embedding for text; an all-zero vector means Titan was unavailable"""
+        return await self._generate_embedding(text)
+    
     async def _generate_embedding(self, text: str) -> List[float]:
         """Generate embedding using Amazon Titan"""
         try:
@@ -265,8 +272,13 @@ Return ONLY the JSON object, no additional text."""
         sources.append("ai_analysis")
         return sources
     
-    def _fallback_analysis(self, term: str, processing_time: float) -> Dict[str, Any]:
-        """Provide fallback analysis when AI fails"""
+    def _fallback_analysis(
+        self,
+        term: str,
+        processing_time: float,
+        embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """Provide fallback analysis when AI fails, keeping an embedding that was already generated"""
         return {
             "explanation": f"'{term}' is a technical term that requires further analysis. Our AI systems are continuously learning to provide comprehensive explanations for emerging technologies and methodologies.",
             "category": "Technology",
@@ -275,7 +287,7 @@ Return ONLY the JSON object, no additional text."""
             "related_terms": [],
             "sources": ["fallback"],
             "processing_time": processing_time,
-            "embedding": [0.0] * 1024,
+            "embedding": embedding or [0.0] * 1024,
             "technical_complexity": "medium",
             "implementation_effort": "moderate",
             "strategic_value": "tactical"
@@ -1,22 +1,89 @@
 import motor.motor_asyncio
+import functools
+import heapq
 import logging
-from typing import List, Dict, Optional, Any
-from datetime import datetime
+import time
+from typing import List, Dict, Optional, Any, Set, Tuple
+from datetime import datetime, timezone
 import numpy as np
+from bson.binary import Binary
+from pymongo import IndexModel, TEXT
 from urllib.parse import quote_plus
 
 logger = logging.getLogger(__name__)
 
+# Fields returned by term searches; excludes the (large) embedding vector
+_TERM_PROJECTION = {"term": 1, "explanation": 1, "category": 1, "metadata": 1, "_id": 0}
+_SUGGESTION_PROJECTION = {"term": 1, "category": 1, "sessions": 1, "_id": 0}
+
+# Aggregation pipelines are static; only the popular-terms $limit varies per call
+_CATEGORY_STATS_PIPELINE = [
+    {
+        "$group": {
+            "_id": "$category",
+            "count": {"$sum": 1},
+            "avg_confidence": {"$avg": "$metadata.confidence"}
+        }
+    },
+    {
+        "$sort": {"count": -1}
+    }
+]
+
+_POPULAR_TERMS_RANKING = [
+    {
+        "$addFields": {
+            "usage_count": {"$size": {"$ifNull": ["$sessions", []]}}
+        }
+    },
+    {
+        "$sort": {"usage_count": -1, "created_at": -1}
+    }
+]
+
+_POPULAR_TERMS_PROJECTION = {
+    "$project": {
+        "term": 1,
+        "category": 1,
+        "usage_count": 1,
+        "confidence": "$metadata.confidence"
+    }
+}
+
+# Upper bound on get_popular_terms results
+_MAX_POPULAR_TERMS = 100
+
+# Sentinel document id in the meta collection; bump when index definitions change
+_INDEXES_VERSION = "indexes_v3"
+
+# BSON binary vector subtype and its FLOAT32 dtype marker
+_VECTOR_SUBTYPE = 9
+_FLOAT32_VECTOR_HEADER = b"\x27\x00"
+
+
+def _encode_embedding(embedding: List[float]) -> Binary:
+    """Pack an embedding as a BSON float32 binary vector (4 bytes per dimension)"""
+    vector = np.asarray(embedding, dtype="<f4")
+    return Binary(_FLOAT32_VECTOR_HEADER + vector.tobytes(), _VECTOR_SUBTYPE)
+
 class MongoVectorService:
     """Service for MongoDB Vector Search integration"""
     
-    def __init__(self, mongodb_uri: str, database_name: str):
+    def __init__(self, mongodb_uri: str, database_name: str, vector_dimension: int = 1024):
         self.mongodb_uri = mongodb_uri
         self.database_name = database_name
+        self.vector_dimension = vector_dimension
         self.client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
         self.database = None
         self.translations_collection = None
         self.sessions_collection = None
+        self.meta_collection = None
+        
+        # Short-lived caches for dashboard aggregations: (expires_at, value)
+        self.stats_cache_ttl = 10.0
+        self._category_stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._popular_terms_cache: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._known_categories: Set[str] = set()
         
     async def initialize(self):
         """Initialize MongoDB connection and collections"""
@@ -42,6 +109,7 @@ class MongoVectorService:
             # Initialize collections
             self.translations_collection = self.database.translations
             self.sessions_collection = self.database.sessions
+            self.meta_collection = self.database.meta
             
             # Ensure vector search index exists
             await self._ensure_vector_indexes()
@@ -57,41 +125,97 @@ class MongoVectorService:
     async def _ensure_vector_indexes(self):
         """Ensure vector search indexes exist"""
         try:
-            # Check if vector search index exists
+            # Skip the index round-trips if this index version was already applied
+            if await self.meta_collection.find_one({"_id": _INDEXES_VERSION}):
+                return
+            
+            # The pre-Atlas 2dsphere index on embedding must go before binary vectors land in that field
+            legacy_index_dropped = await self._drop_legacy_embedding_index()
+            
+            # Ensure the Atlas Vector Search (HNSW) index exists
+            vector_index_ready = await self._ensure_vector_search_index()
+            
+            await self.translations_collection.create_indexes([
+                # Text index for term suggestions
+                IndexModel([
+                    ("term", TEXT),
+                    ("explanation", TEXT),
+                    ("category", TEXT)
+                ], name="text_search_index"),
+                # Performance indexes
+                IndexModel("session_id"),
+                IndexModel("created_at"),
+                IndexModel("category")
+            ])
+            
+            if legacy_index_dropped and vector_index_ready:
+                await self.meta_collection.update_one(
+                    {"_id": _INDEXES_VERSION},
+                    {"$set": {"created_at": datetime.now(timezone.utc)}},
+                    upsert=True
+                )
+            
+        except Exception as e:
+            logger.warning(f"Index creation warning: {str(e)}")
+    
+    async def _drop_legacy_embedding_index(self) -> bool:
+        """Drop the old 2dsphere index on embedding left by earlier deployments"""
+        try:
             indexes = await self.translations_collection.list_indexes().to_list(length=None)
-            vector_index_exists = any(
-                index.get('name') == 'vector_search_index' 
-                for index in indexes
-            )
             
-            if not vector_index_exists:
+            for index in indexes:
+                if index.get("key", {}).get("embedding") == "2dsphere":
+                    logger.info(f"Dropping legacy 2dsphere index {index['name']} on embedding")
+                    await self.translations_collection.drop_index(index["name"])
+            
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Legacy embedding index cleanup failed: {str(e)}")
+            return False
+    
+    async def _ensure_vector_search_index(self) -> bool:
+        """Create the Atlas vectorSearch index over embeddings if missing"""
+        try:
+            existing = await self.translations_collection.aggregate([
+                {"$listSearchIndexes": {"name": "vector_search_index"}}
+            ]).to_list(length=None)
+            
+            if not existing:
                 logger.info("Creating vector search index...")
-                # Note: In production, this should be created via MongoDB Atlas UI
-                # as it requires specific configuration for vector search
-                await self.translations_collection.create_index([
-                    ("embedding", "2dsphere")
-                ], name="vector_search_index")
-            
-            # Ensure text indexes for term suggestions
-            await self.translations_collection.create_index([
-                ("term", "text"),
-                ("explanation", "text"),
-                ("category", "text")
-            ], name="text_search_index")
-            
-            # Ensure performance indexes
-            await self.translations_collection.create_index("session_id")
-            await self.translations_collection.create_index("created_at")
-            await self.translations_collection.create_index("category")
+                await self.database.command({
+                    "createSearchIndexes": self.translations_collection.name,
+                    "indexes": [
+                        {
+                            "name": "vector_search_index",
+                            "type": "vectorSearch",
+                            "definition": {
+                                "fields": [
+                                    {
+                                        "type": "vector",
+                                        "path": "embedding",
+                                        "numDimensions": self.vector_dimension,
+                                        "similarity": "cosine"
+                                    }
+                                ]
+                            }
+                        }
+                    ]
+                })
             
+            return True
+                
         except Exception as e:
-            logger.warning(f"Index creation warning: {str(e)}")
+            # Search indexes are only available on MongoDB Atlas
+            logger.warning(f"Vector search index unavailable: {str(e)}")
+            return False
     
     async def search_similar_terms(
         self, 
         query_text: str, 
         limit: int = 5, 
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for similar terms using vector similarity
@@ -100,18 +224,16 @@ class MongoVectorService:
             query_text: Text to search for
             limit: Maximum number of results
             threshold: Minimum similarity threshold
+            query_embedding: Precomputed embedding of query_text for $vectorSearch
             
         Returns:
             List of similar terms with similarity scores
         """
         try:
-            # For this implementation, we'll use text search as a fallback
-            # In production with MongoDB Atlas, you'd use $vectorSearch
-            
             # First try exact term match
             exact_matches = await self.translations_collection.find({
                 "term": {"$regex": f"^{query_text}$", "$options": "i"}
-            }).limit(limit).to_list(length=None)
+            }, _TERM_PROJECTION).limit(limit).to_list(length=None)
             
             if exact_matches:
                 results = []
@@ -125,10 +247,18 @@ class MongoVectorService:
                     })
                 return results
             
-            # Then try text search
+            # Then try approximate nearest-neighbour search when an embedding is available;
+            # the all-zero fallback embedding has no direction to compare against
+            if query_embedding and any(query_embedding):
+                vector_matches = await self._vector_search(query_embedding, limit)
+                results = [match for match in vector_matches if match["score"] >= threshold]
+                if results:
+                    return results
+            
+            # Fall back to text search
             text_matches = await self.translations_collection.find({
                 "$text": {"$search": query_text}
-            }).limit(limit).to_list(length=None)
+            }, _TERM_PROJECTION).limit(limit).to_list(length=None)
             
             results = []
             for match in text_matches:
@@ -143,12 +273,49 @@ class MongoVectorService:
                         "metadata": match.get("metadata", {})
                     })
             
-            return sorted(results, key=lambda x: x["score"], reverse=True)
+            return heapq.nlargest(limit, results, key=lambda x: x["score"])
             
         except Exception as e:
             logger.error(f"Vector search error: {str(e)}")
             return []
     
+    async def _vector_search(self, query_embedding: List[float], limit: int) -> List[Dict[str, Any]]:
+        """Run an Atlas $vectorSearch query against the embedding index"""
+        try:
+            pipeline = [
+                {
+                    "$vectorSearch": {
+                        "index": "vector_search_index",
+                        "path": "embedding",
+                        "queryVector": _encode_embedding(query_embedding),
+                        "numCandidates": max(200, limit * 20),
+                        "limit": limit
+                    }
+                },
+                {
+                    "$project": {
+                        **_TERM_PROJECTION,
+                        "score": {"$meta": "vectorSearchScore"}
+                    }
+                }
+            ]
+            
+            matches = await self.translations_collection.aggregate(pipeline).to_list(length=None)
+            return [
+                {
+                    "term": match["term"],
+                    "explanation": match["explanation"],
+                    "category": match["category"],
+                    "score": match["score"],
+                    "metadata": match.get("metadata", {})
+                }
+                for match in matches
+            ]
+            
+        except Exception as e:
+            logger.warning(f"$vectorSearch unavailable, using text search: {str(e)}")
+            return []
+    
     async def store_translation(
         self,
         term: str,
@@ -171,14 +338,16 @@ class MongoVectorService:
             Document ID
         """
         try:
+            now = datetime.now(timezone.utc)
+            packed_embedding = _encode_embedding(embedding)
             document = {
                 "term": term,
                 "explanation": explanation,
                 "category": category,
-                "embedding": embedding,
+                "embedding": packed_embedding,
                 "metadata": metadata,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
             
             # Check if term already exists
@@ -192,24 +361,32 @@ class MongoVectorService:
                         "$set": {
                             "explanation": explanation,
                             "category": category,
-                            "embedding": embedding,
-                            "updated_at": datetime.utcnow()
+                            "embedding": packed_embedding,
+                            "updated_at": now
                         },
                         "$addToSet": {
                             "sessions": metadata.get("session_id")
                         }
                     }
                 )
+                self._track_category(category)
                 return str(existing["_id"])
             else:
                 # Insert new entry
                 result = await self.translations_collection.insert_one(document)
+                self._track_category(category)
                 return str(result.inserted_id)
                 
         except Exception as e:
             logger.error(f"Translation storage error: {str(e)}")
             raise
     
+    def _track_category(self, category: str):
+        """Invalidate cached category stats when a previously unseen category is written"""
+        if category not in self._known_categories:
+            self._known_categories.add(category)
+            self._category_stats_cache = None
+    
     async def get_term_suggestions(self, partial_term: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Get term suggestions based on partial input
@@ -227,7 +404,7 @@ class MongoVectorService:
             
             matches = await self.translations_collection.find({
                 "term": {"$regex": pattern, "$options": "i"}
-            }).limit(limit).to_list(length=None)
+            }, _SUGGESTION_PROJECTION).limit(limit).to_list(length=None)
             
             suggestions = []
             for match in matches:
@@ -238,7 +415,7 @@ class MongoVectorService:
                     "usage_count": len(match.get("sessions", []))
                 })
             
-            return sorted(suggestions, key=lambda x: x["confidence"], reverse=True)
+            return heapq.nlargest(limit, suggestions, key=lambda x: x["confidence"])
             
         except Exception as e:
             logger.error(f"Term suggestions error: {str(e)}")
@@ -246,21 +423,12 @@ class MongoVectorService:
     
     async def get_category_stats(self) -> Dict[str, Any]:
         """Get statistics about term categories"""
+        cached = self._category_stats_cache
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
         try:
-            pipeline = [
-                {
-                    "$group": {
-                        "_id": "$category",
-                        "count": {"$sum": 1},
-                        "avg_confidence": {"$avg": "$metadata.confidence"}
-                    }
-                },
-                {
-                    "$sort": {"count": -1}
-                }
-            ]
-            
-            results = await self.translations_collection.aggregate(pipeline).to_list(length=None)
+            results = await self.translations_collection.aggregate(_CATEGORY_STATS_PIPELINE).to_list(length=None)
             
             stats = {
                 "categories": [],
@@ -275,7 +443,9 @@ class MongoVectorService:
                 }
                 stats["categories"].append(category_data)
                 stats["total_terms"] += result["count"]
+                self._known_categories.add(result["_id"])
             
+            self._category_stats_cache = (time.monotonic() + self.stats_cache_ttl, stats)
             return stats
             
         except Exception as e:
@@ -284,30 +454,17 @@ class MongoVectorService:
     
     async def get_popular_terms(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get most popular terms based on usage"""
+        # Clamping also bounds the cache, which is keyed by limit
+        limit = max(1, min(limit, _MAX_POPULAR_TERMS))
+        cached = self._popular_terms_cache.get(limit)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
         try:
-            pipeline = [
-                {
-                    "$addFields": {
-                        "usage_count": {"$size": {"$ifNull": ["$sessions", []]}}
-                    }
-                },
-                {
-                    "$sort": {"usage_count": -1, "created_at": -1}
-                },
-                {
-                    "$limit": limit
-                },
-                {
-                    "$project": {
-                        "term": 1,
-                        "category": 1,
-                        "usage_count": 1,
-                        "confidence": "$metadata.confidence"
-                    }
-                }
-            ]
+            pipeline = [*_POPULAR_TERMS_RANKING, {"$limit": limit}, _POPULAR_TERMS_PROJECTION]
             
             results = await self.translations_collection.aggregate(pipeline).to_list(length=None)
+            self._popular_terms_cache[limit] = (time.monotonic() + self.stats_cache_ttl, results)
             return results
             
         except Exception as e:
@@ -320,7 +477,7 @@ class MongoVectorService:
             document = {
                 "session_id": session_id,
                 "data": session_data,
-                "created_at": datetime.utcnow()
+                "created_at": datetime.now(timezone.utc)
             }
             
             await self.sessions_collection.insert_one(document)
@@ -338,7 +495,9 @@ class MongoVectorService:
             logger.error(f"Session retrieval error: {str(e)}")
             return None
     
-    def _calculate_text_similarity(self, query: str, term: str) -> float:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _calculate_text_similarity(query: str, term: str) -> float:
         """Calculate simple text similarity score"""
         query_lower = query.lower()
         term_lower = term.lower()
@@ -367,7 +526,9 @@ class MongoVectorService:
         
         return intersection / union if union > 0 else 0.0
     
-    def _calculate_suggestion_confidence(self, partial: str, full_term: str) -> float:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _calculate_suggestion_confidence(partial: str, full_term: str) -> float:
         """Calculate confidence score for term suggestions"""
         partial_lower = partial.lower()
         term_lower = full_term.lower()
@@ -1,41 +1,157 @@
 import boto3
 import asyncio
+import functools
 import logging
 import io
+import os
+import uuid
 import wave
-from typing import Optional, Dict, Any, AsyncGenerator
+from typing import Optional, Dict, Any, AsyncGenerator, List, Union
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# The AWS Transcribe Streaming SDK is optional; without it streaming falls
+# back to windowed transcription of the buffered audio
+try:
+    from amazon_transcribe.auth import StaticCredentialResolver
+    from amazon_transcribe.client import TranscribeStreamingClient
+    from amazon_transcribe.model import TranscriptEvent
+except ImportError:
+    TranscribeStreamingClient = None
+
 logger = logging.getLogger(__name__)
 
+# Pooled keep-alive connections shared by every client built below
+_AWS_CLIENT_CONFIG = Config(max_pool_connections=50, tcp_keepalive=True)
+
+# Large audio files are uploaded to S3 in parallel 8 MB parts
+_S3_TRANSFER_CONFIG = TransferConfig(multipart_chunksize=8 * 1024 * 1024, use_threads=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_aws_session(aws_access_key: str, aws_secret_key: str, aws_region: str) -> boto3.Session:
+    """Return a process-wide boto3 session for the given credentials"""
+    return boto3.Session(
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key,
+        region_name=aws_region
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_aws_client(service_name: str, aws_access_key: str, aws_secret_key: str, aws_region: str):
+    """
+    Return a process-wide AWS client for the given service and credentials
+    
+    boto3 clients are thread-safe, so service instances with the same
+    credentials share one client, its endpoint resolution and its
+    connection pool instead of each paying for new TLS handshakes.
+    """
+    session = _get_aws_session(aws_access_key, aws_secret_key, aws_region)
+    return session.client(service_name, config=_AWS_CLIENT_CONFIG)
+
+
+class _AudioRingBuffer:
+    """Fixed-capacity byte ring buffer for smoothing streamed audio"""
+    
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._view = memoryview(bytearray(capacity))
+        self._head = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def write(self, data: memoryview) -> int:
+        """Copy as much of data as fits, returning the number of bytes written"""
+        count = min(len(data), self._capacity - self._size)
+        tail = (self._head + self._size) % self._capacity
+        
+        # Fill up to the end of the storage, then wrap around to the start
+        first = min(count, self._capacity - tail)
+        self._view[tail:tail + first] = data[:first]
+        self._view[:count - first] = data[first:count]
+        
+        self._size += count
+        return count
+    
+    def readinto(self, buffer: bytearray) -> int:
+        """Move up to len(buffer) bytes from the head of the buffer into it"""
+        size = min(len(buffer), self._size)
+        first = min(size, self._capacity - self._head)
+        target = memoryview(buffer)
+        target[:first] = self._view[self._head:self._head + first]
+        target[first:size] = self._view[:size - first]
+        
+        self._head = (self._head + size) % self._capacity
+        self._size -= size
+        return size
+    
+    def read(self, size: int) -> bytes:
+        """Remove and return up to size bytes from the head of the buffer"""
+        size = min(size, self._size)
+        end = self._head + size
+        if end <= self._capacity:
+            data = bytes(self._view[self._head:end])
+        else:
+            data = b"".join((self._view[self._head:], self._view[:end - self._capacity]))
+        
+        self._head = end % self._capacity
+        self._size -= size
+        return data
+
+
 class SpeechToTextService:
     """Service for converting speech to text using AWS Transcribe"""
     
-    def __init__(self, aws_access_key: str, aws_secret_key: str, aws_region: str):
+    # Streaming audio is transcribed in fixed windows drawn from a preallocated ring
+    STREAM_WINDOW_SIZE = 4096
+    RING_BUFFER_SIZE = 64 * 1024
+    WINDOW_POOL_SIZE = 8
+    
+    # AWS Transcribe Streaming takes 16-bit PCM, sent in frames of at most 160 ms
+    STREAMING_FRAME_MS = 160
+    
+    def __init__(
+        self,
+        aws_access_key: str,
+        aws_secret_key: str,
+        aws_region: str,
+        s3_bucket: str = "",
+        streaming_enabled: bool = False
+    ):
         self.aws_access_key = aws_access_key
         self.aws_secret_key = aws_secret_key
         self.aws_region = aws_region
+        self.s3_bucket = s3_bucket
+        
+        # AWS streaming is opt-in and needs real credentials; otherwise the local windowed path is used
+        self.use_aws_streaming = (
+            streaming_enabled
+            and TranscribeStreamingClient is not None
+            and bool(aws_access_key and aws_secret_key)
+        )
         self.transcribe_client = None
         self.s3_client = None
         
+        # Free list of window buffers reused across streaming transcriptions
+        self._window_pool: List[bytearray] = [
+            bytearray(self.STREAM_WINDOW_SIZE) for _ in range(self.WINDOW_POOL_SIZE)
+        ]
+        
         # Initialize AWS clients
         self._init_aws_clients()
     
     def _init_aws_clients(self):
         """Initialize AWS clients"""
         try:
-            self.transcribe_client = boto3.client(
-                'transcribe',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.aws_region
+            self.transcribe_client = _get_aws_client(
+                'transcribe', self.aws_access_key, self.aws_secret_key, self.aws_region
             )
-            
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.aws_region
+            self.s3_client = _get_aws_client(
+                's3', self.aws_access_key, self.aws_secret_key, self.aws_region
             )
             
             logger.info("AWS Transcribe and S3 clients initialized successfully")
@@ -62,11 +178,13 @@ class SpeechToTextService:
             Transcription result with text and confidence
         """
         try:
-            # Collect audio data
-            audio_data = b""
+            # Collect audio data; bytearray.extend grows in place instead of
+            # copying the whole buffer on every chunk
+            buffer = bytearray()
             async for chunk in audio_stream:
-                audio_data += chunk
+                buffer.extend(chunk)
             
+            audio_data = bytes(buffer)
             if not audio_data:
                 return {
                     "text": "",
@@ -106,6 +224,9 @@ class SpeechToTextService:
             Transcription result
         """
         try:
+            if self.s3_bucket:
+                return await self._start_file_transcription_job(audio_file_path, language_code)
+            
             with open(audio_file_path, 'rb') as f:
                 audio_data = f.read()
             
@@ -123,9 +244,47 @@ class SpeechToTextService:
                 "error": str(e)
             }
     
+    async def _start_file_transcription_job(
+        self,
+        audio_file_path: str,
+        language_code: str
+    ) -> Dict[str, Any]:
+        """
+        Upload an audio file to S3 and start an AWS Transcribe job for it
+        
+        The file is streamed to S3 as a multipart upload, so memory use is
+        bounded by the part size rather than the file size.
+        """
+        extension = os.path.splitext(audio_file_path)[1].lower()
+        media_format = extension.lstrip('.') or "mp3"
+        job_name = f"babelfish_{uuid.uuid4().hex}"
+        key = f"transcribe/{job_name}{extension}"
+        
+        with open(audio_file_path, 'rb') as f:
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj, f, self.s3_bucket, key, Config=_S3_TRANSFER_CONFIG
+            )
+        
+        response = await asyncio.to_thread(
+            self.transcribe_client.start_transcription_job,
+            TranscriptionJobName=job_name,
+            LanguageCode=language_code,
+            MediaFormat=media_format,
+            Media={"MediaFileUri": f"s3://{self.s3_bucket}/{key}"}
+        )
+        
+        return {
+            "text": "",
+            "confidence": 0.0,
+            "language_code": language_code,
+            "media_format": media_format,
+            "transcription_job_name": job_name,
+            "status": response["TranscriptionJob"]["TranscriptionJobStatus"]
+        }
+    
     async def _transcribe_audio_data(
         self, 
-        audio_data: bytes,
+        audio_data: Union[bytes, bytearray],
         language_code: str,
         media_format: str
     ) -> Dict[str, Any]:
@@ -165,7 +324,7 @@ class SpeechToTextService:
                 "error": str(e)
             }
     
-    def _mock_transcription(self, audio_data: bytes) -> str:
+    def _mock_transcription(self, audio_data: Union[bytes, bytearray]) -> str:
         """
         Mock transcription for demo purposes
         In production, this would be replaced with actual AWS Transcribe
@@ -184,42 +343,55 @@ class SpeechToTextService:
     async def start_streaming_transcription(
         self,
         audio_stream: AsyncGenerator[bytes, None],
-        language_code: str = "en-US"
+        language_code: str = "en-US",
+        sample_rate: int = 16000
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Start real-time streaming transcription
         
         Args:
-            audio_stream: Audio data stream
+            audio_stream: Audio data stream (16-bit mono PCM for AWS streaming)
             language_code: Language code
+            sample_rate: PCM sample rate in Hz
             
         Yields:
             Partial transcription results
         """
         try:
-            buffer = b""
+            if self.use_aws_streaming:
+                async for result in self._stream_aws_transcription(audio_stream, language_code, sample_rate):
+                    yield result
+                return
+            
+            ring = _AudioRingBuffer(self.RING_BUFFER_SIZE)
             async for chunk in audio_stream:
-                buffer += chunk
-                
-                # Process in chunks (simplified for demo)
-                if len(buffer) > 4096:  # Process every 4KB
-                    partial_result = await self._transcribe_audio_data(
-                        buffer, language_code, "mp3"
-                    )
-                    
-                    yield {
-                        "type": "partial",
-                        "text": partial_result["text"],
-                        "confidence": partial_result["confidence"],
-                        "is_final": False
-                    }
+                pending = memoryview(chunk)
+                while pending:
+                    pending = pending[ring.write(pending):]
                     
-                    buffer = b""
+                    # Process in fixed windows (simplified for demo)
+                    while len(ring) >= self.STREAM_WINDOW_SIZE:
+                        window = self._window_pool.pop() if self._window_pool else bytearray(self.STREAM_WINDOW_SIZE)
+                        try:
+                            ring.readinto(window)
+                            partial_result = await self._transcribe_audio_data(
+                                window, language_code, "mp3"
+                            )
+                        finally:
+                            if len(self._window_pool) < self.WINDOW_POOL_SIZE:
+                                self._window_pool.append(window)
+                        
+                        yield {
+                            "type": "partial",
+                            "text": partial_result["text"],
+                            "confidence": partial_result["confidence"],
+                            "is_final": False
+                        }
             
             # Process remaining buffer
-            if buffer:
+            if ring:
                 final_result = await self._transcribe_audio_data(
-                    buffer, language_code, "mp3"
+                    ring.read(len(ring)), language_code, "mp3"
                 )
                 
                 yield {
@@ -237,10 +409,70 @@ class SpeechToTextService:
                 "is_final": True
             }
     
+    async def _stream_aws_transcription(
+        self,
+        audio_stream: AsyncGenerator[bytes, None],
+        language_code: str,
+        sample_rate: int
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Transcribe over one bidirectional AWS Transcribe Streaming connection
+        
+        Audio is forwarded as it arrives while results are read concurrently,
+        so partials are yielded without waiting for the stream to end.
+        """
+        credential_resolver = None
+        if self.aws_access_key and self.aws_secret_key:
+            credential_resolver = StaticCredentialResolver(self.aws_access_key, self.aws_secret_key)
+        client = TranscribeStreamingClient(region=self.aws_region, credential_resolver=credential_resolver)
+        
+        stream = await client.start_stream_transcription(
+            language_code=language_code,
+            media_sample_rate_hz=sample_rate,
+            media_encoding="pcm"
+        )
+        frame_size = sample_rate * 2 * self.STREAMING_FRAME_MS // 1000
+        
+        async def send_audio():
+            try:
+                async for chunk in audio_stream:
+                    # Split oversized chunks so each event stays within one frame
+                    view = memoryview(chunk)
+                    for start in range(0, len(view), frame_size):
+                        await stream.input_stream.send_audio_event(audio_chunk=bytes(view[start:start + frame_size]))
+            finally:
+                await stream.input_stream.end_stream()
+        
+        sender = asyncio.create_task(send_audio())
+        try:
+            async for event in stream.output_stream:
+                if not isinstance(event, TranscriptEvent):
+                    continue
+                
+                for result in event.transcript.results:
+                    if not result.alternatives:
+                        continue
+                    alternative = result.alternatives[0]
+                    confidences = [item.confidence for item in alternative.items or [] if item.confidence is not None]
+                    
+                    yield {
+                        "type": "partial" if result.is_partial else "final",
+                        "text": alternative.transcript,
+                        "confidence": sum(confidences) / len(confidences) if confidences else 0.0,
+                        "is_final": not result.is_partial
+                    }
+            
+            # Surface any error from the sending side
+            await sender
+        finally:
+            sender.cancel()
+    
     async def get_transcription_job_status(self, job_name: str) -> Dict[str, Any]:
         """Get status of a transcription job"""
         try:
-            response = self.transcribe_client.get_transcription_job(
+            # boto3 calls block for the full round-trip, so keep them off the event loop
+            response = await asyncio.to_thread(
+                self.transcribe_client.get_transcription_job,
                 TranscriptionJobName=job_name
             )
             
@@ -271,7 +503,8 @@ class SpeechToTextService:
     async def list_transcription_jobs(self, max_results: int = 10) -> Dict[str, Any]:
         """List recent transcription jobs"""
         try:
-            response = self.transcribe_client.list_transcription_jobs(
+            response = await asyncio.to_thread(
+                self.transcribe_client.list_transcription_jobs,
                 MaxResults=max_results
             )
             
@@ -290,7 +523,8 @@ class SpeechToTextService:
     async def delete_transcription_job(self, job_name: str) -> Dict[str, Any]:
         """Delete a transcription job"""
         try:
-            self.transcribe_client.delete_transcription_job(
+            await asyncio.to_thread(
+                self.transcribe_client.delete_transcription_job,
                 TranscriptionJobName=job_name
             )
             
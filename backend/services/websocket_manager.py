@@ -1,46 +1,112 @@
 import asyncio
-import json
 import logging
-from typing import Dict, Set, Optional, Any
-from fastapi import WebSocket, WebSocketDisconnect
-from datetime import datetime
+import orjson
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Set, Optional, Any, Iterable, List, Tuple
+from fastapi import WebSocket
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# Application-level keepalive; encoded once since it carries no per-call fields
+_PING_PAYLOAD = orjson.dumps({"type": "ping"}).decode()
+
+
+@dataclass(slots=True)
+class ConnectionState:
+    """Per-session bookkeeping; connected_at is epoch seconds, last_activity is monotonic seconds"""
+    connected_at: float
+    status: str = "connected"
+    last_activity: float = 0.0
+    group_mask: int = 0
+
+
+@dataclass(slots=True)
+class Outbox:
+    """A session's pending frames as (payload, droppable) pairs, plus the event that wakes its writer"""
+    frames: Deque[Tuple[str, bool]] = field(default_factory=deque)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+
 class WebSocketManager:
     """Manager for WebSocket connections and real-time communication"""
     
     def __init__(self):
+        # Connection indexes below are only mutated by await-free code, so no lock is needed
+        # on the single event loop; keep any new mutation free of awaits as well
+        
         # Active connections: session_id -> WebSocket
         self.active_connections: Dict[str, WebSocket] = {}
         
         # Connection metadata
-        self.connection_metadata: Dict[str, Dict[str, Any]] = {}
+        self.connection_metadata: Dict[str, ConnectionState] = {}
         
         # Connection groups for broadcasting
         self.groups: Dict[str, Set[str]] = {
             "active_sessions": set(),
             "listening": set(),
-            "processing": set()
+            "processing": set(),
+            # Opt-in observers (dashboards, admin views) of other sessions' status churn
+            "status_observers": set()
         }
         
+        # Each group owns one bit of a session's ConnectionState.group_mask
+        self._group_bit: Dict[str, int] = {}
+        self._group_names: List[str] = []
+        for group_name in self.groups:
+            self._register_group(group_name)
+        
+        # Running aggregates over connected_at so stats don't scan every session
+        self._oldest_connect_time: Optional[float] = None
+        self._connect_time_sum = 0.0
+        
+        # Sessions reaped by failed sends, announced together by _flush_dead
+        self._pending_dead: Set[str] = set()
+        self._dead_flush_handle: Optional[asyncio.Handle] = None
+        
         # Transcription sessions for real-time voice processing
         self.transcription_sessions: Dict[str, Dict[str, Any]] = {}
         
+        # Per-session outbound queues drained by a dedicated writer task
+        self.outbox: Dict[str, Outbox] = {}
+        self._writer_tasks: Dict[str, asyncio.Task] = {}
+        self._closing_writers: Set[asyncio.Task] = set()
+        self.outbox_size = 64
+        
+        # translation_update messages arriving within this many seconds are merged
+        self.update_coalesce_window = 0.02
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        
+        # A queued send that takes longer than this marks the session as failed
+        self.send_timeout = 5.0
+        
     async def connect(self, websocket: WebSocket, session_id: str):
         """Accept new WebSocket connection"""
         try:
             await websocket.accept()
             
+            connected_at = time.time()
+            previous = self.connection_metadata.pop(session_id, None)
+            if previous is not None:
+                self._forget_connect_time(previous.connected_at)
+            self._connect_time_sum += connected_at
+            if self._oldest_connect_time is None or connected_at < self._oldest_connect_time:
+                self._oldest_connect_time = connected_at
+            
             self.active_connections[session_id] = websocket
-            self.connection_metadata[session_id] = {
-                "connected_at": datetime.utcnow(),
-                "status": "connected",
-                "last_activity": datetime.utcnow()
-            }
+            self._start_writer(session_id, websocket)
+            self.connection_metadata[session_id] = ConnectionState(
+                connected_at=connected_at,
+                last_activity=time.monotonic(),
+                # A re-registered session keeps the groups it was already in
+                group_mask=previous.group_mask if previous is not None else 0
+            )
             
             # Add to active sessions group
-            self.groups["active_sessions"].add(session_id)
+            self.add_to_group(session_id, "active_sessions")
             
             logger.info(f"WebSocket connected: session {session_id}")
             
@@ -48,7 +114,7 @@ class WebSocketManager:
             await self.send_personal_message(session_id, {
                 "type": "connection_established",
                 "session_id": session_id,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": self._now_iso(),
                 "message": "Connected to Babelfish Enterprise AI"
             })
             
@@ -66,49 +132,139 @@ class WebSocketManager:
     async def disconnect(self, websocket: WebSocket, session_id: str):
         """Handle WebSocket disconnection"""
         try:
-            # Remove from all groups
-            for group_name, group_sessions in self.groups.items():
-                group_sessions.discard(session_id)
+            removed = self._remove_session(session_id)
             
-            # Clean up connection data
-            if session_id in self.active_connections:
-                del self.active_connections[session_id]
-            
-            if session_id in self.connection_metadata:
-                # Log session duration
-                metadata = self.connection_metadata[session_id]
-                duration = datetime.utcnow() - metadata["connected_at"]
-                logger.info(f"Session {session_id} disconnected after {duration.total_seconds():.2f} seconds")
-                del self.connection_metadata[session_id]
+            # A session already reaped by a failed send was announced by _flush_dead
+            if not removed:
+                return
             
             # Broadcast disconnection update
-            await self.broadcast_to_group("active_sessions", {
-                "type": "session_disconnected", 
-                "session_id": session_id,
-                "total_active": len(self.active_connections)
-            })
+            await self.broadcast_to_group("active_sessions", self._disconnected_message([session_id]))
             
             logger.info(f"WebSocket disconnected: session {session_id}")
             
         except Exception as e:
             logger.error(f"WebSocket disconnection error for session {session_id}: {str(e)}")
     
-    async def send_personal_message(self, session_id: str, message: Dict[str, Any]):
-        """Send message to specific session"""
+    def _remove_session(self, session_id: str) -> bool:
+        """Drop a session from every index, returning whether it was still registered"""
+        removed = self.active_connections.pop(session_id, None) is not None
+        
+        self._stop_writer(session_id)
+        
+        # Discard translation updates still waiting for their coalescing window
+        handle = self._flush_handles.pop(session_id, None)
+        if handle is not None:
+            handle.cancel()
+        self._pending_updates.pop(session_id, None)
+        
+        metadata = self.connection_metadata.pop(session_id, None)
+        if metadata is not None:
+            # Remove from all groups
+            for group_name in self._groups_from_mask(metadata.group_mask):
+                self.groups[group_name].discard(session_id)
+            
+            # Log session duration
+            duration = time.time() - metadata.connected_at
+            logger.info(f"Session {session_id} disconnected after {duration:.2f} seconds")
+            self._forget_connect_time(metadata.connected_at)
+            removed = True
+        
+        return removed
+    
+    def _mark_dead(self, session_id: str):
+        """Reap a session whose socket failed mid-send without broadcasting from inside the send path"""
+        if not self._remove_session(session_id):
+            return
+        
+        self._pending_dead.add(session_id)
+        if self._dead_flush_handle is None:
+            self._dead_flush_handle = asyncio.get_running_loop().call_soon(self._flush_dead)
+    
+    def _flush_dead(self):
+        """Announce every session reaped since the last flush in one broadcast"""
+        self._dead_flush_handle = None
+        session_ids = sorted(self._pending_dead)
+        self._pending_dead.clear()
+        
+        self._fan_out(self.groups["active_sessions"], self._encode(self._disconnected_message(session_ids)))
+        
+        logger.info(f"WebSocket disconnected after send failure: sessions {', '.join(session_ids)}")
+    
+    def _disconnected_message(self, session_ids: List[str]) -> Dict[str, Any]:
+        """Build the session_disconnected event; session_ids is always present, session_id only for a single session"""
+        message = {
+            "type": "session_disconnected",
+            "session_ids": session_ids,
+            "total_active": len(self.active_connections)
+        }
+        if len(session_ids) == 1:
+            message["session_id"] = session_ids[0]
+        
+        return message
+    
+    async def send_personal_message(self, session_id: str, message: Dict[str, Any]) -> bool:
+        """Send message to specific session, returning False if it could not be queued"""
         try:
-            if session_id in self.active_connections:
-                websocket = self.active_connections[session_id]
-                await websocket.send_text(json.dumps(message))
-                
-                # Update last activity
-                if session_id in self.connection_metadata:
-                    self.connection_metadata[session_id]["last_activity"] = datetime.utcnow()
+            # Queued behind the session's other traffic so its writer task stays the socket's only sender
+            return self._enqueue(session_id, self._encode(message), droppable=False)
                     
-        except WebSocketDisconnect:
-            logger.info(f"WebSocket disconnected during message send: {session_id}")
-            await self.disconnect(None, session_id)
         except Exception as e:
             logger.error(f"Error sending message to session {session_id}: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _encode(message: Dict[str, Any]) -> str:
+        """Serialize a message once; the resulting string is shared by every recipient's outbox"""
+        return orjson.dumps(message).decode()
+    
+    @staticmethod
+    def _now_iso() -> str:
+        """Format the current UTC time for an outbound message"""
+        return datetime.now(timezone.utc).isoformat()
+    
+    def _start_writer(self, session_id: str, websocket: WebSocket):
+        """Create the session's outbound queue and the task that drains it"""
+        self._stop_writer(session_id)
+        
+        outbox = Outbox()
+        self.outbox[session_id] = outbox
+        self._writer_tasks[session_id] = asyncio.create_task(
+            self._writer_loop(session_id, websocket, outbox)
+        )
+    
+    def _stop_writer(self, session_id: str):
+        """Drop the session's outbound queue and cancel its writer task"""
+        self.outbox.pop(session_id, None)
+        task = self._writer_tasks.pop(session_id, None)
+        
+        # A writer that hit a send failure disconnects its own session
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            # The loop only holds tasks weakly; keep this one alive until the cancellation lands
+            self._closing_writers.add(task)
+            task.add_done_callback(self._closing_writers.discard)
+    
+    async def _writer_loop(self, session_id: str, websocket: WebSocket, outbox: Outbox):
+        """Write queued payloads to one session until it fails or is cancelled"""
+        while True:
+            while not outbox.frames:
+                outbox.ready.clear()
+                await outbox.ready.wait()
+            payload, _ = outbox.frames.popleft()
+            try:
+                await asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to send to session {session_id}: {str(e)}")
+                self._mark_dead(session_id)
+                return
+            
+            # Update last activity
+            metadata = self.connection_metadata.get(session_id)
+            if metadata is not None:
+                metadata.last_activity = time.monotonic()
     
     async def broadcast_to_group(self, group_name: str, message: Dict[str, Any]):
         """Broadcast message to all sessions in a group"""
@@ -116,37 +272,105 @@ class WebSocketManager:
             logger.warning(f"Unknown group: {group_name}")
             return
         
-        failed_sessions = []
+        self._fan_out(self.groups[group_name], self._encode(message))
+    
+    def _fan_out(self, session_ids: Iterable[str], payload: str) -> int:
+        """Queue one serialized broadcast payload for many sessions without waiting on any socket"""
+        # Nothing here awaits and droppable frames never disconnect a session,
+        # so the live group can be iterated without a snapshot copy
+        queued = 0
         
-        for session_id in self.groups[group_name].copy():
-            try:
-                await self.send_personal_message(session_id, message)
-            except Exception as e:
-                logger.error(f"Failed to broadcast to session {session_id}: {str(e)}")
-                failed_sessions.append(session_id)
+        for session_id in session_ids:
+            if self._enqueue(session_id, payload, droppable=True):
+                queued += 1
         
-        # Clean up failed sessions
-        for session_id in failed_sessions:
-            await self.disconnect(None, session_id)
+        return queued
+    
+    def _enqueue(self, session_id: str, payload: str, droppable: bool) -> bool:
+        """Append a frame to a session's outbox, returning whether it was queued"""
+        outbox = self.outbox.get(session_id)
+        if outbox is None:
+            return False
+        
+        frames = outbox.frames
+        if len(frames) >= self.outbox_size:
+            # A slow consumer loses its oldest broadcast rather than stalling the sender
+            for index, (_, queued_droppable) in enumerate(frames):
+                if queued_droppable:
+                    del frames[index]
+                    logger.debug(f"Outbox full for session {session_id}, dropped oldest broadcast")
+                    break
+            else:
+                if droppable:
+                    logger.debug(f"Outbox full of replies for session {session_id}, dropped broadcast")
+                    return False
+                
+                # Replies are never discarded; a client this far behind is cut off instead
+                logger.warning(f"Outbox full of replies for session {session_id}, disconnecting")
+                self._mark_dead(session_id)
+                return False
+        
+        frames.append((payload, droppable))
+        outbox.ready.set()
+        return True
     
     async def broadcast_to_all(self, message: Dict[str, Any]):
         """Broadcast message to all active connections"""
         await self.broadcast_to_group("active_sessions", message)
     
+    def _register_group(self, group_name: str) -> int:
+        """Assign the next free membership bit to a group"""
+        bit = len(self._group_names)
+        self._group_bit[group_name] = bit
+        self._group_names.append(group_name)
+        self.groups.setdefault(group_name, set())
+        return bit
+    
+    def _groups_from_mask(self, group_mask: int) -> List[str]:
+        """Decode a membership bitmask into group names"""
+        group_names = []
+        
+        # Visit only the set bits, lowest first, so cost tracks membership rather than group count
+        while group_mask:
+            lowest_bit = group_mask & -group_mask
+            group_names.append(self._group_names[lowest_bit.bit_length() - 1])
+            group_mask ^= lowest_bit
+        
+        return group_names
+    
     def add_to_group(self, session_id: str, group_name: str):
         """Add session to a group"""
-        if group_name not in self.groups:
-            self.groups[group_name] = set()
+        metadata = self.connection_metadata.get(session_id)
+        if metadata is None:
+            logger.warning(f"Cannot add unknown session {session_id} to group {group_name}")
+            return
+        
+        bit = self._group_bit.get(group_name)
+        if bit is None:
+            bit = self._register_group(group_name)
         
         self.groups[group_name].add(session_id)
+        metadata.group_mask |= 1 << bit
         logger.debug(f"Added session {session_id} to group {group_name}")
     
     def remove_from_group(self, session_id: str, group_name: str):
         """Remove session from a group"""
         if group_name in self.groups:
             self.groups[group_name].discard(session_id)
+            metadata = self.connection_metadata.get(session_id)
+            if metadata is not None:
+                metadata.group_mask &= ~(1 << self._group_bit[group_name])
             logger.debug(f"Removed session {session_id} from group {group_name}")
     
+    def subscribe_to_status_events(self, session_id: str):
+        """Opt a session in to receiving every session's status changes"""
+        if session_id in self.active_connections:
+            self.add_to_group(session_id, "status_observers")
+    
+    def unsubscribe_from_status_events(self, session_id: str):
+        """Stop delivering other sessions' status changes to a session"""
+        self.remove_from_group(session_id, "status_observers")
+    
     async def handle_session_status_change(self, session_id: str, status: str):
         """Handle session status changes (listening, processing, idle)"""
         try:
@@ -159,16 +383,17 @@ class WebSocketManager:
                 self.add_to_group(session_id, status)
             
             # Update metadata
-            if session_id in self.connection_metadata:
-                self.connection_metadata[session_id]["status"] = status
-                self.connection_metadata[session_id]["last_activity"] = datetime.utcnow()
+            metadata = self.connection_metadata.get(session_id)
+            if metadata is not None:
+                metadata.status = status
+                metadata.last_activity = time.monotonic()
             
-            # Broadcast status change
-            await self.broadcast_to_group("active_sessions", {
+            # Broadcast status change to subscribed observers only
+            await self.broadcast_to_group("status_observers", {
                 "type": "session_status_change",
                 "session_id": session_id,
                 "status": status,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": self._now_iso()
             })
             
         except Exception as e:
@@ -176,26 +401,43 @@ class WebSocketManager:
     
     async def send_translation_update(self, session_id: str, update_data: Dict[str, Any]):
         """Send translation progress update to specific session"""
-        message = {
+        if session_id not in self.outbox:
+            return
+        
+        # Updates inside one window merge key by key, latest value wins
+        pending = self._pending_updates.setdefault(session_id, {})
+        pending.update(update_data)
+        
+        if session_id not in self._flush_handles:
+            self._flush_handles[session_id] = asyncio.get_running_loop().call_later(
+                self.update_coalesce_window, self._flush_updates, session_id
+            )
+    
+    def _flush_updates(self, session_id: str):
+        """Send the merged translation updates collected for a session as one message"""
+        self._flush_handles.pop(session_id, None)
+        update_data = self._pending_updates.pop(session_id, None)
+        if not update_data:
+            return
+        
+        self._enqueue(session_id, self._encode({
             "type": "translation_update",
             "session_id": session_id,
             "data": update_data,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        await self.send_personal_message(session_id, message)
+            "timestamp": self._now_iso()
+        }), droppable=False)
     
-    async def send_error_message(self, session_id: str, error: str, error_code: Optional[str] = None):
-        """Send error message to specific session"""
+    async def send_error_message(self, session_id: str, error: str, error_code: Optional[str] = None) -> bool:
+        """Send error message to specific session, returning False if it could not be queued"""
         message = {
             "type": "error",
             "session_id": session_id,
             "error": error,
             "error_code": error_code,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": self._now_iso()
         }
         
-        await self.send_personal_message(session_id, message)
+        return await self.send_personal_message(session_id, message)
     
     async def send_system_notification(self, notification: str, level: str = "info"):
         """Send system notification to all active sessions"""
@@ -203,25 +445,25 @@ class WebSocketManager:
             "type": "system_notification",
             "notification": notification,
             "level": level,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": self._now_iso()
         }
         
         await self.broadcast_to_all(message)
     
     def get_active_sessions(self) -> Dict[str, Dict[str, Any]]:
         """Get information about all active sessions"""
-        sessions = {}
-        
-        for session_id, metadata in self.connection_metadata.items():
-            sessions[session_id] = {
-                **metadata,
-                "groups": [
-                    group for group, members in self.groups.items() 
-                    if session_id in members
-                ]
-            }
+        # last_activity is tracked on the monotonic clock; shift it onto wall-clock time for callers
+        wall_offset = time.time() - time.monotonic()
         
-        return sessions
+        return {
+            session_id: {
+                "connected_at": datetime.fromtimestamp(metadata.connected_at, timezone.utc).isoformat(),
+                "status": metadata.status,
+                "last_activity": datetime.fromtimestamp(metadata.last_activity + wall_offset, timezone.utc).isoformat(),
+                "groups": self._groups_from_mask(metadata.group_mask)
+            }
+            for session_id, metadata in self.connection_metadata.items()
+        }
     
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get connection statistics"""
@@ -239,65 +481,51 @@ class WebSocketManager:
         if not self.connection_metadata:
             return 0.0
         
-        total_duration = 0.0
-        current_time = datetime.utcnow()
-        
-        for metadata in self.connection_metadata.values():
-            duration = (current_time - metadata["connected_at"]).total_seconds()
-            total_duration += duration
-        
-        return total_duration / len(self.connection_metadata)
+        # mean(now - connected_at) == now - mean(connected_at)
+        return time.time() - self._connect_time_sum / len(self.connection_metadata)
     
     def _get_oldest_connection_time(self) -> Optional[str]:
         """Get the timestamp of the oldest connection"""
-        if not self.connection_metadata:
+        if self._oldest_connect_time is None:
             return None
         
-        oldest = min(
-            self.connection_metadata.values(),
-            key=lambda x: x["connected_at"]
-        )
+        return datetime.fromtimestamp(self._oldest_connect_time, timezone.utc).isoformat()
+    
+    def _forget_connect_time(self, connected_at: float):
+        """Remove a departed session's connect time from the running aggregates"""
+        if not self.connection_metadata:
+            self._connect_time_sum = 0.0
+            self._oldest_connect_time = None
+            return
+        
+        self._connect_time_sum -= connected_at
         
-        return oldest["connected_at"].isoformat()
+        # Only rescan when the oldest session is the one that left
+        if connected_at == self._oldest_connect_time:
+            self._oldest_connect_time = min(
+                metadata.connected_at for metadata in self.connection_metadata.values()
+            )
     
     async def cleanup_inactive_connections(self, timeout_minutes: int = 30):
         """Clean up connections that have been inactive for too long"""
-        current_time = datetime.utcnow()
-        timeout_delta = datetime.timedelta(minutes=timeout_minutes)
+        cutoff = time.monotonic() - timeout_minutes * 60.0
         
-        inactive_sessions = []
-        
-        for session_id, metadata in self.connection_metadata.items():
-            if current_time - metadata["last_activity"] > timeout_delta:
-                inactive_sessions.append(session_id)
+        inactive_sessions = [
+            session_id for session_id, metadata in self.connection_metadata.items()
+            if metadata.last_activity < cutoff
+        ]
         
         for session_id in inactive_sessions:
             logger.info(f"Cleaning up inactive session: {session_id}")
-            await self.disconnect(None, session_id)
+        
+        await asyncio.gather(*[self.disconnect(None, session_id) for session_id in inactive_sessions])
         
         return len(inactive_sessions)
     
     async def ping_all_connections(self):
         """Send ping to all connections to check connectivity"""
-        ping_message = {
-            "type": "ping",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        failed_sessions = []
-        
-        for session_id in list(self.active_connections.keys()):
-            try:
-                await self.send_personal_message(session_id, ping_message)
-            except Exception as e:
-                logger.warning(f"Ping failed for session {session_id}: {str(e)}")
-                failed_sessions.append(session_id)
-        
-        # Clean up failed sessions
-        for session_id in failed_sessions:
-            await self.disconnect(None, session_id)
-        
-        return len(self.active_connections) - len(failed_sessions)
+        # Sessions whose ping cannot be written are disconnected by their writer task
+        return self._fan_out(self.active_connections, _PING_PAYLOAD)
     
     def start_transcription_session(self, session_id: str, websocket: WebSocket, language_code: str = "en-US"):
         """Start a new transcription session"""
@@ -307,7 +535,7 @@ class WebSocketManager:
                 "language_code": language_code,
                 "buffer": b"",
                 "active": True,
-                "started_at": datetime.utcnow(),
+                "started_at": datetime.now(timezone.utc),
                 "total_audio_processed": 0
             }
             
@@ -324,7 +552,7 @@ class WebSocketManager:
                 session_info["active"] = False
                 
                 # Log session statistics
-                duration = datetime.utcnow() - session_info["started_at"]
+                duration = datetime.now(timezone.utc) - session_info["started_at"]
                 logger.info(f"Transcription session {session_id} stopped after {duration.total_seconds():.2f} seconds")
                 
                 del self.transcription_sessions[session_id]
@@ -351,7 +579,7 @@ class WebSocketManager:
                 message = {
                     "type": "transcription_update",
                     "session_id": session_id,
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": self._now_iso(),
                     **transcription_data
                 }
                 
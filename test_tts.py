@@ -3,74 +3,68 @@
 Test script for the new text-to-speech functionality
 """
 
-import requests
-import json
+import asyncio
+import httpx
 
-def test_tts():
-    """Test the text-to-speech endpoints"""
-    
-    # Test the main synthesis endpoint
-    print("🧪 Testing main synthesis endpoint...")
-    response = requests.post(
-        "http://localhost:8000/api/voice/synthesize",
-        headers={"Content-Type": "application/json"},
-        json={
-            "text": "Hello! This is a test of the new text to speech system. It should now speak actual words instead of just a beep.",
-            "voice_style": "professional_female",
-            "speed": 1.0
-        }
-    )
-    
+def report_audio(label: str, response: httpx.Response, filename: str):
+    """Print the result of a synthesis request and save its audio"""
     if response.status_code == 200:
-        print("✅ Main synthesis endpoint working!")
+        print(f"✅ {label} working!")
         print(f"   Audio size: {len(response.content)} bytes")
         
         # Save the audio file
-        with open("test_main_tts.wav", "wb") as f:
+        with open(filename, "wb") as f:
             f.write(response.content)
-        print("   Saved as: test_main_tts.wav")
+        print(f"   Saved as: {filename}")
     else:
-        print(f"❌ Main synthesis failed: {response.status_code}")
+        print(f"❌ {label} failed: {response.status_code}")
         print(f"   Response: {response.text}")
+
+async def test_tts():
+    """Test the text-to-speech endpoints"""
+    
+    async with httpx.AsyncClient(base_url="http://localhost:8000", timeout=60.0) as client:
+        # The three requests are independent, so issue them together
+        main_response, test_response, health_response = await asyncio.gather(
+            client.post(
+                "/api/voice/synthesize",
+                json={
+                    "text": "Hello! This is a test of the new text to speech system. It should now speak actual words instead of just a beep.",
+                    "voice_style": "professional_female",
+                    "speed": 1.0
+                }
+            ),
+            client.post(
+                "/api/voice/test",
+                json={
+                    "text": "This is the test endpoint. It should also speak actual words.",
+                    "voice_style": "professional_male"
+                }
+            ),
+            client.get("/")
+        )
+    
+    # Test the main synthesis endpoint
+    print("🧪 Testing main synthesis endpoint...")
+    report_audio("Main synthesis endpoint", main_response, "test_main_tts.wav")
     
     # Test the test endpoint
     print("\n🧪 Testing test endpoint...")
-    response = requests.post(
-        "http://localhost:8000/api/voice/test",
-        headers={"Content-Type": "application/json"},
-        json={
-            "text": "This is the test endpoint. It should also speak actual words.",
-            "voice_style": "professional_male"
-        }
-    )
-    
-    if response.status_code == 200:
-        print("✅ Test endpoint working!")
-        print(f"   Audio size: {len(response.content)} bytes")
-        
-        # Save the audio file
-        with open("test_endpoint_tts.wav", "wb") as f:
-            f.write(response.content)
-        print("   Saved as: test_endpoint_tts.wav")
-    else:
-        print(f"❌ Test endpoint failed: {response.status_code}")
-        print(f"   Response: {response.text}")
+    report_audio("Test endpoint", test_response, "test_endpoint_tts.wav")
     
     # Test health endpoint
     print("\n🧪 Testing health endpoint...")
-    response = requests.get("http://localhost:8000/")
-    
-    if response.status_code == 200:
+    if health_response.status_code == 200:
         print("✅ Health endpoint working!")
-        health_data = response.json()
+        health_data = health_response.json()
         print(f"   Services: {health_data.get('services', [])}")
     else:
-        print(f"❌ Health endpoint failed: {response.status_code}")
+        print(f"❌ Health endpoint failed: {health_response.status_code}")
 
 if __name__ == "__main__":
     print("🎤 Testing Text-to-Speech System")
     print("=" * 40)
-    test_tts()
+    asyncio.run(test_tts())
     print("\n🎉 Test completed!")
     print("\nTo test in browser:")
     print("1. Open http://localhost:3000")